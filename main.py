@@ -12,21 +12,31 @@ Meeting Alerts — Google Calendar + Google Cloud TTS
 
 import os
 import sys
+import re
 import json
+import string
+import hashlib
 import time
-import math
 import socket
 import logging
 import traceback
 import threading
-import pygame
-from google.cloud import texttospeech
 from io import BytesIO
 from datetime import datetime, timedelta
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from dateutil import tz
-from flask import Flask, send_from_directory, abort
+from flask import Flask, send_file, send_from_directory, abort
+
+try:
+    from ciso8601 import parse_datetime as _parse_dt
+except ImportError:
+    _parse_dt = datetime.fromisoformat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # =============================================================================
 # Estrutura de pastas e arquivos
@@ -94,6 +104,13 @@ except Exception:
 # =============================================================================
 
 TZ_NAME = os.getenv("TZ", "America/Sao_Paulo")
+_TZ_ERROR = None  # logado depois que o logger existir
+try:
+    _TZ = ZoneInfo(TZ_NAME)
+except (ValueError, ZoneInfoNotFoundError) as e:
+    _TZ_ERROR = f"TZ inválido '{TZ_NAME}' ({e!r}); usando America/Sao_Paulo."
+    TZ_NAME = "America/Sao_Paulo"
+    _TZ = ZoneInfo(TZ_NAME)
 CALENDAR_ID = os.getenv("CALENDAR_ID", "primary")
 LEAD_MINUTES = int(os.getenv("LEAD_MINUTES", 5))
 EXCLUDE_KEYWORDS = [
@@ -101,16 +118,19 @@ EXCLUDE_KEYWORDS = [
     for k in os.getenv("EXCLUDE_KEYWORDS", "almoço,almoco,lunch").split(",")
     if k.strip()
 ]
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, EXCLUDE_KEYWORDS)), re.IGNORECASE) if EXCLUDE_KEYWORDS else None
 
 LOCAL_IP = os.getenv("LOCAL_IP", "127.0.0.1")
 LOCAL_PORT = int(os.getenv("LOCAL_PORT", "8001"))
 NEST_IP = os.getenv("NEST_IP", "192.168.15.172")
 NEST_PORT = int(os.getenv("NEST_PORT", "8009"))
 
-ALERT_PHRASE = os.getenv(
-    "ALERT_PHRASE",
-    'Gustavo, você tem uma reunião "{summary}" às {hora}, em {lead}.'
-)
+TTS_LANG = "pt-BR"
+TTS_VOICE = "pt-BR-Standard-B"
+TTS_CACHE_TTL = int(os.getenv("TTS_CACHE_TTL", 7 * 24 * 3600))
+
+DEFAULT_ALERT_PHRASE = 'Gustavo, você tem uma reunião "{summary}" às {hora}, em {lead}.'
+ALERT_PHRASE = os.getenv("ALERT_PHRASE", DEFAULT_ALERT_PHRASE)
 
 # =============================================================================
 # Logging
@@ -132,8 +152,9 @@ class ColorFormatter(logging.Formatter):
     RESET = "\033[0m"
 
     def format(self, record):
-        color = self.COLORS.get(record.levelname, "")
-        return f"{color}{super().format(record)}{self.RESET}"
+        color = self.COLORS.get(record.levelname)
+        msg = logging.Formatter.format(self, record)
+        return color + msg + self.RESET if color else msg
 
 
 ch = logging.StreamHandler(sys.stdout)
@@ -141,6 +162,9 @@ ch.setLevel(logging.INFO if (SHOW_LOGS_IN_CONSOLE or DEBUG_MODE) else logging.ER
 ch.setFormatter(ColorFormatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S"))
 logger.addHandler(ch)
 
+if _TZ_ERROR:
+    logger.warning(_TZ_ERROR)
+
 
 def log_start_end(tag: str, start: bool = True) -> None:
     bar = "─" * 60
@@ -152,10 +176,22 @@ def log_start_end(tag: str, start: bool = True) -> None:
 
 app = Flask(__name__)
 
+# índice em memória dos MP3 em TTS_DIR (varrido do disco só no 1º acesso)
+_tts_index: set = set()
+_tts_index_loaded = False
+
+
+def _tts_index_names() -> set:
+    global _tts_index_loaded
+    if not _tts_index_loaded:
+        _tts_index.update(p.name for p in TTS_DIR.glob("*.mp3"))
+        _tts_index_loaded = True
+    return _tts_index
+
 
 @app.get("/tts/_ls")
 def tts_list():
-    items = sorted(p.name for p in TTS_DIR.glob("*.mp3"))
+    items = sorted(_tts_index_names().copy())
     logger.info(f"[HTTP] /tts/_ls => {len(items)} arquivos")
     return "\n".join(items) + ("\n" if items else ""), 200, {
         "Content-Type": "text/plain; charset=utf-8",
@@ -163,14 +199,24 @@ def tts_list():
     }
 
 
+# MP3 do cache de TTS: nome = hash do conteúdo, então nunca muda
+_TTS_CACHE_NAME_RE = re.compile(r"^[0-9a-f]{40}\.mp3$")
+
+
 @app.get("/tts/<path:filename>")
 def serve_tts(filename: str):
+    path = TTS_DIR / filename
     try:
-        resp = send_from_directory(directory=str(TTS_DIR), path=filename, mimetype="audio/mpeg", max_age=0)
-        logger.info(f"[HTTP] 200 /tts → {(TTS_DIR / filename).resolve()}")
+        if _TTS_CACHE_NAME_RE.match(filename):
+            # nome já validado pelo regex (só hex): dispensa o safe_join; Range/304 via conditional
+            resp = send_file(path, mimetype="audio/mpeg", conditional=True, max_age=3600)
+        else:
+            resp = send_from_directory(directory=str(TTS_DIR), path=filename, mimetype="audio/mpeg", max_age=0)
+        logger.info(f"[HTTP] 200 /tts → {path.resolve()}")
         return resp
     except Exception as e:
-        logger.warning(f"[HTTP] 404 /tts → {(TTS_DIR / filename).resolve()} ({e})")
+        logger.warning(f"[HTTP] 404 /tts → {path.resolve()} ({e})")
+        _tts_index.discard(filename)
         abort(404)
 
 
@@ -180,21 +226,26 @@ def healthz():
 
 
 def start_flask_server():
+    ready = threading.Event()
+
     def run():
-        app.run(host="0.0.0.0", port=LOCAL_PORT, debug=False, use_reloader=False)
+        # o servidor é criado (bind + listen) antes de sinalizar: daí em diante já aceita conexões
+        try:
+            from waitress import create_server
+            srv = create_server(app, host="0.0.0.0", port=LOCAL_PORT, threads=4)
+            serve_forever = srv.run
+        except ImportError:
+            from werkzeug.serving import make_server
+            srv = make_server("0.0.0.0", LOCAL_PORT, app, threaded=True)
+            serve_forever = srv.serve_forever
+        ready.set()
+        serve_forever()
 
     threading.Thread(target=run, daemon=True).start()
 
-    # espera subir
-    import requests
-    url = f"http://127.0.0.1:{LOCAL_PORT}/healthz"
-    for _ in range(50):
-        try:
-            r = requests.get(url, timeout=0.3, proxies={"http": None, "https": None})
-            if r.status_code == 200:
-                break
-        except Exception:
-            time.sleep(0.1)
+    if not ready.wait(timeout=2):
+        logger.warning(f"[HTTP] Flask não subiu na porta {LOCAL_PORT} (porta em uso?)")
+        return
     logger.info(f"[HTTP] Flask ON. TTS_DIR={TTS_DIR}")
     logger.info(f"[HTTP] Acesse: http://{LOCAL_IP}:{LOCAL_PORT}/tts/_ls")
 
@@ -230,14 +281,15 @@ def get_calendar_service():
 # =============================================================================
 
 def tz_now() -> datetime:
-    return datetime.now(tz.gettz(TZ_NAME))
+    return datetime.now(_TZ)
 
 
 def load_seen() -> dict:
     if not CACHE_FILE.exists():
         return {}
     try:
-        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        raw = CACHE_FILE.read_bytes()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
         today = tz_now().date().isoformat()
         return {k: v for k, v in data.items() if v.get("date") == today}
     except Exception:
@@ -245,47 +297,163 @@ def load_seen() -> dict:
 
 
 def save_seen(seen: dict) -> None:
-    CACHE_FILE.write_text(json.dumps(seen, ensure_ascii=False, indent=2), encoding="utf-8")
+    if orjson:
+        payload = orjson.dumps(seen, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(seen, ensure_ascii=False, indent=2).encode("utf-8")
+    # escrita atômica: nunca deixa um JSON pela metade se o processo cair
+    tmp = CACHE_FILE.with_suffix(".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, CACHE_FILE)
 
 
 def mark_alerted(seen: dict, key: str) -> None:
-    seen[key] = {"date": tz_now().date().isoformat(), "time": tz_now().strftime("%H:%M:%S")}
+    now = tz_now()
+    seen[key] = {"date": now.date().isoformat(), "time": now.strftime("%H:%M:%S")}
     save_seen(seen)
 
 
-def _tcp_open(ip: str, port: int, timeout: float = 3) -> bool:
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(timeout)
+def _tts_cache_key(text: str) -> str:
+    """Chave do cache de TTS: BLAKE2b-160 de (texto, idioma, voz)."""
+    payload = f"{text}|{TTS_LANG}|{TTS_VOICE}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+_reach_cache: dict = {}  # (ip, port) -> (monotonic, ok)
+
+
+def _tcp_open(ip: str, port: int, timeout: float = 0.5, ttl: float = 10.0) -> bool:
+    """Testa se ip:port aceita TCP; o resultado é reaproveitado por `ttl` segundos."""
+    cached = _reach_cache.get((ip, port))
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
     try:
-        return s.connect_ex((ip, port)) == 0
-    finally:
-        s.close()
+        with socket.create_connection((ip, port), timeout=timeout):
+            ok = True
+    except OSError:
+        ok = False
+    _reach_cache[(ip, port)] = (time.monotonic(), ok)
+    return ok
 
 # =============================================================================
 # TTS (Google Cloud) + Fallback
 # =============================================================================
 
+# libs pesadas (gRPC, zeroconf...) só são importadas quando realmente necessárias
+_texttospeech = None
+_pychromecast = None
+
+_tts_client = None
+_tts_voice = None
+_tts_audio_config = None
+_tts_lock = threading.Lock()
+
+
+def _load_texttospeech() -> None:
+    """Importa google.cloud.texttospeech uma única vez (ImportError sobe só para o TTS)."""
+    global _texttospeech
+    if _texttospeech is None:
+        from google.cloud import texttospeech
+
+        _texttospeech = texttospeech
+
+
+def _load_pychromecast() -> None:
+    """Importa pychromecast uma única vez, independente do Cloud TTS."""
+    global _pychromecast
+    if _pychromecast is None:
+        import pychromecast
+
+        _pychromecast = pychromecast
+
+
+def _prefetch_tts_deps() -> None:
+    """Adianta os imports em background; uma lib ausente só é reportada quando for usada."""
+    for load in (_load_texttospeech, _load_pychromecast):
+        try:
+            load()
+        except Exception as e:
+            logger.debug(f"[Prefetch] {load.__name__}: {e}")
+
+
+def _get_tts_client():
+    """Cliente do Cloud TTS criado uma única vez (canal gRPC reaproveitado entre alertas)."""
+    global _tts_client, _tts_voice, _tts_audio_config
+    if _tts_client is None:
+        with _tts_lock:
+            if _tts_client is None:
+                _load_texttospeech()
+                os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(GOOGLE_TTS_KEY)
+                _tts_voice = _texttospeech.VoiceSelectionParams(language_code=TTS_LANG, name=TTS_VOICE)
+                _tts_audio_config = _texttospeech.AudioConfig(audio_encoding=_texttospeech.AudioEncoding.MP3)
+                _tts_client = _texttospeech.TextToSpeechClient()
+    return _tts_client
+
+
+_cast = None
+
+
+def _get_cast():
+    """Conexão Cast com o Nest Hub, reaproveitada dentro da passada (reconecta se caiu)."""
+    global _cast
+    cast = _cast
+    if cast is not None and cast.status is not None and cast.socket_client.is_connected:
+        return cast
+
+    _load_pychromecast()
+    _reset_cast()
+    host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
+    cast = _pychromecast.get_chromecast_from_host(host_info)
+    cast.wait()
+    _cast = cast
+    return cast
+
+
+def _reset_cast() -> None:
+    """Desconecta e descarta a conexão Cast em cache; a próxima chamada a _get_cast() reconecta."""
+    global _cast
+    cast, _cast = _cast, None
+    if cast is not None:
+        try:
+            cast.disconnect(timeout=0)
+        except Exception:
+            pass
+
+
 def speak(text: str) -> None:
     """Síntese com Google Cloud TTS e reprodução no Nest Hub ou via Bluetooth."""
     try:
-        from google.cloud import texttospeech
-        import pychromecast, requests
-
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(GOOGLE_TTS_KEY)
         os.environ.setdefault("NO_PROXY", f"127.0.0.1,localhost,{LOCAL_IP}")
         os.environ.setdefault("no_proxy", f"127.0.0.1,localhost,{LOCAL_IP}")
 
-        # 🎤 Gera o áudio
-        client = texttospeech.TextToSpeechClient()
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(language_code="pt-BR", name="pt-BR-Standard-B")
-        audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-        response = client.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
-
-        filename = f"speech_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
+        # 🗃️ Cache em disco (mesma frase → mesmo MP3)
+        key = _tts_cache_key(text)
+        filename = f"{key}.mp3"
         filepath = TTS_DIR / filename
-        filepath.write_bytes(response.audio_content)
-        logger.info(f"[TTS] Gravado: {filepath} ({filepath.stat().st_size} bytes)")
+
+        if filepath.exists() and filepath.stat().st_size > 0:
+            logger.info(f"[TTS] Cache hit: {filepath} ({filepath.stat().st_size} bytes)")
+        else:
+            # 🎤 Gera o áudio
+            client = _get_tts_client()
+            synthesis_input = _texttospeech.SynthesisInput(text=text)
+            response = client.synthesize_speech(
+                input=synthesis_input, voice=_tts_voice, audio_config=_tts_audio_config
+            )
+
+            # escrita atômica: o Flask nunca serve (nem o cache reaproveita) um MP3 pela metade
+            tmp = filepath.with_suffix(".tmp")
+            tmp.write_bytes(response.audio_content)
+            os.replace(tmp, filepath)
+            _tts_index.add(filename)
+            (TTS_DIR / f"{key}.json").write_text(
+                json.dumps(
+                    {"created": datetime.now().isoformat(timespec="seconds"), "text": text, "ttl": TTS_CACHE_TTL},
+                    ensure_ascii=False,
+                ),
+                encoding="utf-8",
+            )
+            logger.info(f"[TTS] Gravado: {filepath} ({filepath.stat().st_size} bytes)")
         url_public = f"http://{LOCAL_IP}:{LOCAL_PORT}/tts/{filename}"
 
         # 🔌 Verifica conexão com o Nest
@@ -294,10 +462,8 @@ def speak(text: str) -> None:
             _speak_fallback(text)
             return
 
-        # 📡 Conecta ao Nest
-        host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
-        cast = pychromecast.get_chromecast_from_host(host_info)
-        cast.wait()
+        # 📡 Conecta ao Nest (reaproveita a conexão, se ainda ativa)
+        cast = _get_cast()
 
         # 🔄 Atualiza status (substitui refresh/get_status)
         try:
@@ -365,6 +531,7 @@ def speak(text: str) -> None:
 
     except Exception as e:
         logger.error(f"Erro no Google TTS: {e}")
+        _reset_cast()
         _speak_fallback(text)
 
 
@@ -372,15 +539,15 @@ def _speak_local(text: str) -> None:
     """Reproduz o TTS localmente (útil quando o Nest está como caixa Bluetooth)."""
     try:
 
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(GOOGLE_TTS_KEY)
-
-        client = texttospeech.TextToSpeechClient()
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(language_code="pt-BR", name="pt-BR-Standard-B")
-        audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-        response = client.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
+        client = _get_tts_client()
+        synthesis_input = _texttospeech.SynthesisInput(text=text)
+        response = client.synthesize_speech(
+            input=synthesis_input, voice=_tts_voice, audio_config=_tts_audio_config
+        )
 
         logger.info("🔊 Tocando áudio local (modo Bluetooth ativo)")
+        import pygame
+
         pygame.mixer.init()
         pygame.mixer.music.load(BytesIO(response.audio_content))
         pygame.mixer.music.play()
@@ -401,9 +568,7 @@ def _speak_local(text: str) -> None:
             logger.error(f"Erro no fallback local: {suberr}")
 
 
-        host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
-        cast = pychromecast.get_chromecast_from_host(host_info)
-        cast.wait()
+        cast = _get_cast()
         try:
             if hasattr(cast, "update_status"):
                 cast.update_status()
@@ -475,8 +640,9 @@ def _speak_local(text: str) -> None:
 
 def _humanize_timedelta(seconds: float) -> str:
     """Converte delta em segundos numa frase (pt-BR), arredondando para cima."""
-    secs = max(0, int(math.ceil(seconds)))
-    mins = math.ceil(secs / 60)
+    whole = int(seconds)
+    secs = max(0, whole + (seconds > whole))
+    mins = -(-secs // 60)
 
     if mins < 1:
         return "menos de um minuto"
@@ -493,27 +659,56 @@ def _humanize_timedelta(seconds: float) -> str:
     return f"{horas} horas e {resto} {'minuto' if resto == 1 else 'minutos'}"
 
 
-def _build_alert_message(summary: str, start_dt: datetime) -> str:
-    agora_dt = tz_now()
+class _PhraseFields(dict):
+    """Campos da ALERT_PHRASE; placeholder desconhecido vira texto vazio (sem KeyError)."""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+# valida a ALERT_PHRASE uma vez, na carga, em vez de descobrir o erro no alerta
+try:
+    _ALERT_FIELDS = {name for _, name, _, _ in string.Formatter().parse(ALERT_PHRASE) if name is not None}
+    _ALERT_POSITIONAL = sorted(n for n in _ALERT_FIELDS if re.match(r"\d*(?:[.\[]|$)", n))
+    if _ALERT_POSITIONAL:
+        raise ValueError(f"campos posicionais não suportados: {_ALERT_POSITIONAL}")
+    # ensaio com campos vazios: pega conversão, formato ou atributo inválidos
+    ALERT_PHRASE.format_map(_PhraseFields(summary="", hora="", lead="", agora=""))
+    _ALERT_UNKNOWN = sorted(_ALERT_FIELDS - {"summary", "hora", "lead", "agora"})
+except Exception as e:
+    logger.error(f"ALERT_PHRASE mal formada ({e!r}); usando a frase padrão.")
+    ALERT_PHRASE = DEFAULT_ALERT_PHRASE
+    _ALERT_UNKNOWN = []
+if _ALERT_UNKNOWN:
+    logger.warning(f"ALERT_PHRASE com placeholders desconhecidos (ficarão vazios): {_ALERT_UNKNOWN}")
+
+
+def _build_alert_message(summary: str, start_dt: datetime, now_dt: datetime | None = None) -> str:
+    agora_dt = now_dt or tz_now()
     lead_str = _humanize_timedelta((start_dt - agora_dt).total_seconds())
-    return ALERT_PHRASE.format(
+    return ALERT_PHRASE.format_map(_PhraseFields(
         summary=summary,
-        hora=start_dt.strftime("%H:%M"),
+        hora=start_dt.astimezone(_TZ).strftime("%H:%M"),
         lead=lead_str,
         agora=agora_dt.strftime("%H:%M"),
-    )
+    ))
 
 # =============================================================================
 # Execução principal (uma passada)
 # =============================================================================
 
 def run_once():
-    start_flask_server()
+    # Flask sobe em paralelo com o OAuth/consulta ao Calendar (ambos I/O-bound)
+    server_boot = threading.Thread(target=start_flask_server, daemon=True)
+    server_boot.start()
+    # adianta os imports de TTS/Cast enquanto o Calendar responde
+    threading.Thread(target=_prefetch_tts_deps, daemon=True).start()
     log_start_end("MeetingAlerts Run", start=True)
 
     try:
-        hours_ahead = 12 if DEBUG_MODE else 2
-        logger.info(f"Config: LEAD={LEAD_MINUTES}min TZ={TZ_NAME} RANGE={hours_ahead}h DEBUG={DEBUG_MODE}")
+        # fora do DEBUG só interessa a janela de aviso (LEAD + 60s de tolerância)
+        range_sec = 12 * 3600 if DEBUG_MODE else LEAD_MINUTES * 60 + 60
+        logger.info(f"Config: LEAD={LEAD_MINUTES}min TZ={TZ_NAME} RANGE={range_sec // 60}min DEBUG={DEBUG_MODE}")
 
         service = get_calendar_service()
 
@@ -525,50 +720,58 @@ def run_once():
             logger.info("[DEBUG] Cache resetado.")
 
         # eventos
+        now = tz_now()
         events = service.events().list(
             calendarId=CALENDAR_ID,
-            timeMin=tz_now().isoformat(),
-            timeMax=(tz_now() + timedelta(hours=hours_ahead)).isoformat(),
+            timeMin=now.isoformat(),
+            timeMax=(now + timedelta(seconds=range_sec)).isoformat(),
             singleEvents=True,
-            orderBy="startTime"
+            orderBy="startTime",
+            maxResults=50,
+            fields="items(status,summary,start/dateTime)",
         ).execute().get("items", [])
 
         logger.info(f"Eventos obtidos: {len(events)}")
+
+        # o MP3 só é servido depois que o Flask estiver no ar
+        server_boot.join()
         evento_alertado = False
 
+        now = tz_now()
         for e in events:
+            # filtros baratos primeiro; o parse da data fica por último
             if e.get("status") == "cancelled":
                 continue
 
+            summary = e.get("summary", "(sem título)")
+            if _EXCLUDE_RE and _EXCLUDE_RE.search(summary):
+                logger.info(f"[Ignorado por palavra-chave] '{summary}'")
+                continue
+
             start_str = e.get("start", {}).get("dateTime")
             if not start_str:
                 continue
 
-            start = datetime.fromisoformat(start_str).astimezone(tz.gettz(TZ_NAME))
-            summary = e.get("summary", "(sem título)")
-            if any(k in summary.lower() for k in EXCLUDE_KEYWORDS):
-                logger.info(f"[Ignorado por palavra-chave] '{summary}'")
-                continue
+            # RFC 3339 com offset: já é aware, a conversão p/ _TZ fica só na exibição
+            start = _parse_dt(start_str)
 
-            delta_sec = (start - tz_now()).total_seconds()
-            logger.info(f"→ '{summary}' às {start.strftime('%H:%M')} (delta={delta_sec/60:.2f} min)")
+            delta_sec = (start - now).total_seconds()
+            logger.info(f"→ '{summary}' às {start.astimezone(_TZ):%H:%M} (delta={delta_sec/60:.2f} min)")
 
             # DEBUG: fala o primeiro evento
             if DEBUG_MODE:
-                msg = _build_alert_message(summary, start)
+                msg = _build_alert_message(summary, start, now)
                 logger.info(f"[DEBUG] {msg}")
                 speak(msg)
                 evento_alertado = True
                 break
 
-            # janela de aviso (LEAD ± 60s)
-            lead_window = LEAD_MINUTES * 60
-            tolerance = 60
-            if -tolerance <= delta_sec <= (lead_window + tolerance):
+            # janela de aviso (LEAD ± 60s) — o limite superior já vem do timeMax
+            if delta_sec >= -60:
                 if not REPEAT_ALERTS and summary in seen:
                     logger.info(f"[Ignorado - já alertado hoje] '{summary}'")
                     continue
-                msg = _build_alert_message(summary, start)
+                msg = _build_alert_message(summary, start, now)
                 logger.info(f"[Aviso emitido] {msg}")
                 speak(msg)
                 mark_alerted(seen, summary)
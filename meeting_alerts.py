@@ -9,25 +9,27 @@ Meeting Alerts — versão robusta com Google Cloud TTS
 • Em modo DEBUG, busca todas as reuniões até 10h e fala apenas a primeira.
 """
 
-import os, sys, json, time, socket, logging, traceback, threading
+import os, sys, json, time, socket, sqlite3, hashlib, logging, tempfile, traceback, threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from dateutil import tz
 from pathlib import Path
-from flask import Flask, send_from_directory, abort
-
-# --- Auto-activate local venv (if not already active) ---
-import os, sys
-if not os.environ.get("VIRTUAL_ENV"):
-    venv_dir = os.path.join(os.path.dirname(__file__), ".venv")
-    activate_this = os.path.join(venv_dir, "Scripts", "activate_this.py" if os.name == "nt" else "bin/activate_this.py")
-    if os.path.exists(activate_this):
-        with open(activate_this) as f:
-            code = compile(f.read(), activate_this, 'exec')
-            exec(code, dict(__file__=activate_this))
-        print("[INFO] Virtualenv ativado automaticamente.")
-    else:
-        print("[INFO] Virtualenv não encontrada. Execute 'setup_venv.bat' ou 'setup_venv.sh' primeiro.")
-        sys.exit(1)
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from flask import Flask, Response, request, abort
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+try:
+    from ciso8601 import parse_datetime as _parse
+except ImportError:  # sem o parser em C, o da stdlib resolve (mais lento)
+    _parse = datetime.fromisoformat
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj): return json.dumps(obj, ensure_ascii=False)
 
 # ---- Configuração de debug -----------------------------------------------
 try:
@@ -57,12 +59,15 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 TTS_DIR = os.path.join(BASE_DIR, "tts")
 os.makedirs(LOG_DIR, exist_ok=True)
+TTS_CACHE_DIR = os.path.join(TTS_DIR, "cache")
 os.makedirs(TTS_DIR, exist_ok=True)
-CACHE_FILE = os.path.join(BASE_DIR, "alerts_seen.json")
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+CACHE_DB = os.path.join(BASE_DIR, "alerts_seen.db")
 
 # ---- Configurações padrão -------------------------------------------------
 TZ_NAME = os.getenv("TZ", "America/Sao_Paulo")
 CALENDAR_ID = os.getenv("CALENDAR_ID", "primary")
+CALENDAR_IDS = [c.strip() for c in CALENDAR_ID.split(",") if c.strip()] or ["primary"]
 LEAD_MINUTES = int(os.getenv("LEAD_MINUTES", 5))
 WINDOW_MINUTES = int(os.getenv("WINDOW_MINUTES", 10))
 EXCLUDE_KEYWORDS = [k.strip().lower() for k in os.getenv(
@@ -73,6 +78,15 @@ NEST_PORT = int(os.getenv("NEST_PORT", "8009"))
 LOCAL_IP = os.getenv("LOCAL_IP", "192.168.15.6")
 LOCAL_PORT = int(os.getenv("LOCAL_PORT", "8001"))
 GOOGLE_TTS_KEY = os.path.join(BASE_DIR, "google_tts_key.json")
+ALERT_PHRASE = os.getenv(
+    "ALERT_PHRASE",
+    'Gustavo, você tem uma reunião "{summary}" às {hora}, em {lead}.'
+)
+TTS_CACHE_MAX_FILES = int(os.getenv("TTS_CACHE_MAX_FILES", 200))
+PREWARM_EVENTS = int(os.getenv("PREWARM_EVENTS", 2))  # 0 desliga a pré-síntese
+# intervalo até a próxima execução (run_alerts_loop.bat o define; no Agendador, use o do agendamento).
+# Sem ele não dá para prever o {lead} da próxima frase → 0 desliga a pré-síntese.
+RUN_INTERVAL_SECONDS = int(os.getenv("RUN_INTERVAL_SECONDS") or 0)
 
 # ---- Logging --------------------------------------------------------------
 LOG_FILE = os.path.join(LOG_DIR, f"alerts_{datetime.now().strftime('%Y-%m-%d')}.log")
@@ -94,14 +108,18 @@ class ColorFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
     def format(self, record):
-        color = self.COLORS.get(record.levelname, "")
-        return f"{color}{super().format(record)}{self.RESET}"
+        color = self.COLORS.get(record.levelname)
+        msg = logging.Formatter.format(self, record)
+        return color + msg + self.RESET if color else msg
 
 ch = logging.StreamHandler(sys.stdout)
 ch.setLevel(logging.INFO if SHOW_LOGS_IN_CONSOLE or DEBUG_MODE else logging.ERROR)
 ch.setFormatter(ColorFormatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S"))
 logger.addHandler(ch)
 
+# sem access log do Werkzeug: uma linha formatada a menos por GET no /tts
+logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
 def log_start_end(tag, start=True):
     bar = "─" * 60
     logger.info(f"{bar}\n{'▶ START' if start else '■ END'} {tag}\n{bar}")
@@ -109,10 +127,12 @@ def log_start_end(tag, start=True):
 # ---- Servidor Flask embutido ---------------------------------------------
 app = Flask(__name__)
 TTS_PATH = (Path(__file__).with_name("tts")).resolve()
+SEND_INLINE_MAX = 1024 * 1024  # até aqui o MP3 vai inteiro num único write
+SEND_BUFFER_SIZE = 64 * 1024   # acima disso, streaming em blocos de 64 KB
 
 @app.get("/tts/_ls")
 def tts_list():
-    items = sorted(p.name for p in TTS_PATH.glob("*.mp3"))
+    items = sorted(p.relative_to(TTS_PATH).as_posix() for p in TTS_PATH.rglob("*.mp3"))
     logger.info(f"[HTTP] /tts/_ls => {len(items)} arquivos")
     return "\n".join(items) + ("\n" if items else ""), 200, {
         "Content-Type": "text/plain; charset=utf-8",
@@ -121,49 +141,69 @@ def tts_list():
 
 @app.get("/tts/<path:filename>")
 def serve_tts(filename: str):
-    try:
-        resp = send_from_directory(
-            directory=str(TTS_PATH),
-            path=filename,
-            mimetype="audio/mpeg",
-            max_age=0
-        )
-        logger.info(f"[HTTP] 200 /tts → {(TTS_PATH / filename).resolve()}")
-        return resp
-    except Exception as e:
-        logger.warning(f"[HTTP] 404 /tts → {(TTS_PATH / filename).resolve()} ({e})")
+    path = safe_join(str(TTS_PATH), filename)
+    if path is None or not os.path.isfile(path):
+        logger.warning(f"[HTTP] 404 /tts → {(TTS_PATH / filename).resolve()}")
         abort(404)
 
+    st = os.stat(path)
+    size = st.st_size
+    if size <= SEND_INLINE_MAX:
+        with open(path, "rb") as f:
+            resp = Response(f.read(), mimetype="audio/mpeg")
+    else:
+        data = wrap_file(request.environ, open(path, "rb"), buffer_size=SEND_BUFFER_SIZE)
+        resp = Response(data, mimetype="audio/mpeg", direct_passthrough=True)
+        resp.content_length = size
+    resp.cache_control.max_age = 0
+    if filename.startswith("cache/"):
+        # nome = SHA-256 do conteúdo; o mtime é tocado a cada hit (LRU) e não serve de validador
+        resp.set_etag(f"{os.path.splitext(os.path.basename(path))[0]}-{size:x}")
+    else:
+        resp.set_etag(f"{st.st_mtime_ns:x}-{size:x}")
+        resp.last_modified = st.st_mtime
+    # trata Range e If-None-Match/If-Modified-Since (re-pedido do Cast vira 304)
+    resp.make_conditional(request.environ, accept_ranges=True, complete_length=size)
+    logger.info(f"[HTTP] 200 /tts → {path}")
+    return resp
+
 @app.get("/healthz")
 def healthz():
     return "ok", 200
 
 def start_flask_server():
     def run():
-        app.run(host="0.0.0.0", port=LOCAL_PORT, debug=False, use_reloader=False)
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(host="0.0.0.0", port=LOCAL_PORT, debug=False, use_reloader=False)
+            return
+        serve(app, host="0.0.0.0", port=LOCAL_PORT, threads=4, _quiet=True)
     t = threading.Thread(target=run, daemon=True)
     t.start()
 
-    import requests
-    base = f"http://127.0.0.1:{LOCAL_PORT}/healthz"
-    for _ in range(50):
+    # espera o bind: basta o TCP conectar na porta local (sem HTTP)
+    for _ in range(100):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(0.05)
         try:
-            r = requests.get(base, timeout=0.3, proxies={"http": None, "https": None})
-            if r.status_code == 200:
+            if s.connect_ex(("127.0.0.1", LOCAL_PORT)) == 0:
                 break
-        except Exception:
-            time.sleep(0.1)
+        finally:
+            s.close()
+        time.sleep(0.02)
 
     logger.info(f"[HTTP] Flask ON. TTS_PATH={TTS_PATH}")
     logger.info(f"[HTTP] Acesse: http://{LOCAL_IP}:{LOCAL_PORT}/tts/_ls")
 
 # ---- Google Calendar Auth -------------------------------------------------
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
-def get_calendar_service():
+# resposta parcial: só o que o loop de alertas, o cache e a paginação usam
+CALENDAR_FIELDS = "items(id,status,summary,iCalUID,start/dateTime,end/dateTime),nextPageToken,nextSyncToken"
+def get_calendar_credentials():
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
     token_path = os.path.join(BASE_DIR, "token.json")
     cred_path = os.path.join(BASE_DIR, "credentials.json")
     creds = None
@@ -177,115 +217,358 @@ def get_calendar_service():
             creds = flow.run_local_server(port=0)
         with open(token_path, "w", encoding="utf-8") as f:
             f.write(creds.to_json())
+    return creds
+
+def get_calendar_service(creds=None):
+    from googleapiclient.discovery import build
+    if creds is None:
+        creds = get_calendar_credentials()
     return build("calendar", "v3", credentials=creds, cache_discovery=False)
 
+def _sync_calendar(service, cal_id, token, time_min):
+    """
+    Sincroniza uma agenda: com `token`, só as mudanças desde a última busca;
+    sem token (ou com token expirado → HTTP 410), carga completa a partir de `time_min`.
+    Devolve (itens, próximo syncToken, se foi carga completa).
+    """
+    from googleapiclient.errors import HttpError
+    params = {"calendarId": cal_id, "singleEvents": True, "fields": CALENDAR_FIELDS}
+    if token:
+        params["syncToken"] = token
+    else:
+        params["timeMin"] = time_min
+
+    items, page_token = [], None
+    while True:
+        try:
+            resp = service.events().list(pageToken=page_token, **params).execute()
+        except HttpError as err:
+            if token and err.resp.status == 410:
+                logger.info(f"[Calendar] syncToken expirado ({cal_id}); refazendo carga completa.")
+                return _sync_calendar(service, cal_id, None, time_min)
+            raise
+        items.extend(resp.get("items", []))
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return items, resp.get("nextSyncToken"), not token
+
+def _store_events(db, cal_id, items, full):
+    """Aplica no cache local os eventos (ou deltas) recebidos de uma agenda."""
+    if full:
+        db.execute("DELETE FROM events WHERE cal = ?", (cal_id,))
+    for e in items:
+        start_str = e.get("start", {}).get("dateTime")
+        end_str = e.get("end", {}).get("dateTime")
+        if e.get("status") == "cancelled" or not start_str or not end_str:
+            # removido/cancelado, ou virou evento de dia inteiro (nunca alertado)
+            db.execute("DELETE FROM events WHERE cal = ? AND id = ?", (cal_id, e["id"]))
+            continue
+        db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)",
+            (
+                cal_id,
+                e["id"],
+                _parse(start_str).timestamp(),
+                _parse(end_str).timestamp(),
+                _dumps(e),
+            ),
+        )
+
+def fetch_events(creds, now, time_max):
+    """
+    Eventos de todas as agendas de CALENDAR_IDS que ainda não terminaram e começam
+    antes de `time_max`, em ordem de início e sem duplicados. A API só devolve as
+    mudanças desde a última execução (syncToken); o resto vem do cache em SQLite.
+    """
+    db = _cache_db()
+    tokens = dict(db.execute("SELECT cal, token FROM sync_tokens"))
+
+    def fetch(cal_id):
+        # um service por thread: o httplib2 por baixo não é thread-safe
+        service = get_calendar_service(creds)
+        return _sync_calendar(service, cal_id, tokens.get(cal_id), now.isoformat())
+
+    if len(CALENDAR_IDS) == 1:
+        results = [fetch(CALENDAR_IDS[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(CALENDAR_IDS))) as ex:
+            results = list(ex.map(fetch, CALENDAR_IDS))
+
+    db.execute("BEGIN")
+    try:
+        for cal_id, (items, sync_token, full) in zip(CALENDAR_IDS, results):
+            _store_events(db, cal_id, items, full)
+            db.execute("INSERT OR REPLACE INTO sync_tokens VALUES (?, ?)", (cal_id, sync_token))
+        db.execute("DELETE FROM events WHERE end_ts <= ?", (now.timestamp(),))
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+    marks = ",".join("?" * len(CALENDAR_IDS))
+    rows = db.execute(
+        f"SELECT data FROM events WHERE cal IN ({marks}) AND end_ts > ? AND start_ts < ? ORDER BY start_ts",
+        (*CALENDAR_IDS, now.timestamp(), time_max.timestamp()),
+    )
+
+    # mesmo convite em duas agendas → mesmo iCalUID (instâncias recorrentes diferem no início)
+    seen_ids = set()
+    events = []
+    for (data,) in rows:
+        e = _loads(data)
+        uid = (e.get("iCalUID") or e.get("id"), e["start"]["dateTime"])
+        if uid in seen_ids:
+            continue
+        seen_ids.add(uid)
+        events.append(e)
+    return events
+
 # ---- Utilitários ----------------------------------------------------------
-def tz_now(): return datetime.now(tz.gettz(TZ_NAME))
+try:
+    _TZ = ZoneInfo(TZ_NAME)
+except (ValueError, ZoneInfoNotFoundError) as e:
+    logger.warning(f"TZ inválido '{TZ_NAME}' ({e!r}); usando America/Sao_Paulo.")
+    TZ_NAME = "America/Sao_Paulo"
+    _TZ = ZoneInfo(TZ_NAME)
+
+def tz_now(): return datetime.now(_TZ)
+
+_db = None
+
+def _cache_db():
+    """Conexão SQLite (WAL, autocommit): alertas do dia, eventos e syncTokens do Calendar."""
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(CACHE_DB, isolation_level=None, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS seen(key TEXT PRIMARY KEY, date TEXT, time TEXT)")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS events("
+            "cal TEXT, id TEXT, start_ts REAL, end_ts REAL, data TEXT, PRIMARY KEY (cal, id))"
+        )
+        _db.execute("CREATE TABLE IF NOT EXISTS sync_tokens(cal TEXT PRIMARY KEY, token TEXT)")
+    return _db
 
 def load_seen():
-    if not os.path.exists(CACHE_FILE): return {}
+    today = tz_now().date().isoformat()
     try:
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        today = tz_now().date().isoformat()
-        return {k: v for k, v in data.items() if v.get("date") == today}
-    except Exception:
+        return dict(_cache_db().execute("SELECT key, date FROM seen WHERE date = ?", (today,)))
+    except sqlite3.Error:
         return {}
 
-def save_seen(seen):
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(seen, f, ensure_ascii=False, indent=2)
+def purge_seen(today):
+    """Remove os alertas de dias anteriores; devolve quantos foram apagados."""
+    return _cache_db().execute("DELETE FROM seen WHERE date <> ?", (today,)).rowcount
 
 def mark_alerted(seen, key):
-    seen[key] = {"date": tz_now().date().isoformat(), "time": tz_now().strftime("%H:%M:%S")}
-    save_seen(seen)
+    now = tz_now()
+    today = now.date().isoformat()
+    seen[key] = today
+    _cache_db().execute(
+        "INSERT OR REPLACE INTO seen VALUES (?, ?, ?)", (key, today, now.strftime("%H:%M:%S"))
+    )
 
-def _tcp_open(ip, port, timeout=3):
+_tcp_probe_cache = {}  # (ip, port) -> monotonic do último probe bem-sucedido
+
+def _tcp_open(ip, port, timeout=1.0, ttl=5):
+    """Probe TCP na LAN (1 s basta); só o sucesso vale por `ttl` s."""
+    k = (ip, port)
+    cached = _tcp_probe_cache.get(k)
+    if cached is not None and time.monotonic() - cached < ttl:
+        return True
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.settimeout(timeout)
     try:
-        return s.connect_ex((ip, port)) == 0
+        ok = s.connect_ex((ip, port)) == 0
     finally:
         s.close()
+    if ok:
+        _tcp_probe_cache[k] = time.monotonic()
+    else:
+        _tcp_probe_cache.pop(k, None)
+    return ok
+
+def _nest_reachable():
+    """Com a conexão Cast viva o Nest está acessível; só sem ela cai no probe TCP."""
+    cast = _cast_singleton
+    if cast is not None and cast.socket_client.is_connected:
+        return True
+    return _tcp_open(NEST_IP, NEST_PORT)
+
+def _tts_cache_key(text, voice):
+    """SHA-256 de (texto, voz, idioma, formato) — mesma frase, mesmo MP3."""
+    raw = f"{text}|{voice.name}|{voice.language_code}|MP3"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _prune_tts_cache(max_files=TTS_CACHE_MAX_FILES):
+    """LRU: mantém só os `max_files` MP3 usados mais recentemente (por mtime)."""
+    try:
+        entries = [e for e in os.scandir(TTS_CACHE_DIR) if e.name.endswith(".mp3")]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in entries[max_files:]:
+            os.remove(e.path)
+        if len(entries) > max_files:
+            logger.info(f"[TTS] Cache: {len(entries) - max_files} arquivo(s) antigo(s) removido(s).")
+    except OSError as e:
+        logger.warning(f"[TTS] Falha ao limpar cache: {e}")
+
+# ---- Cloud TTS + Cast (importados e instanciados uma vez) -----------------
+os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_TTS_KEY
+try:
+    import pychromecast as _pcc
+except Exception as e:
+    logger.error(f"[Cast] pychromecast indisponível ({e}); o Nest não poderá ser usado.")
+    _pcc = None
+
+try:
+    from google.cloud import texttospeech as _tts
+    _tts_client = _tts.TextToSpeechClient()  # canal gRPC reaproveitado entre alertas
+    _VOICE = _tts.VoiceSelectionParams(
+        language_code="pt-BR",
+        name="pt-BR-Standard-B",
+        ssml_gender=_tts.SsmlVoiceGender.MALE
+    )
+    _AUDIO_CFG = _tts.AudioConfig(audio_encoding=_tts.AudioEncoding.MP3)
+    _TTS_AVAILABLE = True
+except Exception as e:
+    logger.warning(f"[TTS] Google Cloud TTS indisponível ({e}); só o fallback será usado.")
+    _TTS_AVAILABLE = False
+
+# ---- Conexão Cast (persistente) -------------------------------------------
+PLAYBACK_TIMEOUT = 10  # teto (s) para esperar o fim da fala
+
+class _DoneListener:
+    """MediaStatusListener: sinaliza quando a *nossa* mídia começou e voltou para IDLE."""
+    def __init__(self):
+        self.done = threading.Event()
+        self._started = False
+        self._url = None
+
+    def reset(self, url):
+        self._url = url
+        self._started = False
+        self.done.clear()
+
+    def new_media_status(self, status):
+        # status da sessão anterior do Nest (outra mídia) não conta
+        content_id = getattr(status, "content_id", None)
+        state = getattr(status, "player_state", None)
+        if state in ("PLAYING", "BUFFERING"):
+            if content_id == self._url:
+                self._started = True
+        elif self._started and state in ("IDLE", "UNKNOWN") and content_id in (self._url, None):
+            # ao terminar, o receiver às vezes já manda o IDLE sem a mídia
+            self.done.set()
+
+    def load_media_failed(self, item, error_code):
+        self.done.set()
+
+_playback = _DoneListener()
+_cast_singleton = None
+
+def get_cast():
+    """Conecta ao Nest Hub uma vez; o fallback da mesma passada reaproveita o socket."""
+    global _cast_singleton
+    cast = _cast_singleton
+    if cast is not None and cast.socket_client.is_connected:
+        return cast
+    if _pcc is None:
+        raise RuntimeError("pychromecast não está instalado")
+    host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
+    cast = _pcc.get_chromecast_from_host(host_info)
+    cast.wait()
+    cast.media_controller.register_status_listener(_playback)
+    _cast_singleton = cast
+    return cast
+
+def _drop_cast():
+    """Descarta a conexão em cache (após erro); o próximo get_cast() reconecta."""
+    global _cast_singleton
+    cast, _cast_singleton = _cast_singleton, None
+    if cast is not None:
+        try:
+            cast.disconnect(timeout=0)
+        except Exception:
+            pass
 
 # ---- TTS via Google Cloud + Fallback -------------------------------------
+def _synthesize_cached(text):
+    """
+    Garante o MP3 de `text` no cache de TTS (só chama a API se ainda não existir).
+    Devolve (nome relativo a /tts, se veio do cache).
+    """
+    key = _tts_cache_key(text, _VOICE)
+    filepath = os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+        os.utime(filepath)  # marca como usado recentemente (LRU)
+        return f"cache/{key}.mp3", True
+
+    response = _tts_client.synthesize_speech(
+        input=_tts.SynthesisInput(text=text), voice=_VOICE, audio_config=_AUDIO_CFG
+    )
+
+    # escrita atômica: o Flask nunca serve um MP3 pela metade. Sem fsync: o Cast lê
+    # via HTTP (page cache) e, se o arquivo se perder num crash, basta sintetizar de novo
+    with tempfile.NamedTemporaryFile(dir=TTS_CACHE_DIR, suffix=".tmp", delete=False) as out:
+        out.write(response.audio_content)
+    os.replace(out.name, filepath)
+
+    logger.info(f"[TTS] Gravado: {filepath} ({os.path.getsize(filepath)} bytes)")
+    return f"cache/{key}.mp3", False
+
 def speak(text: str) -> None:
     try:
-        from google.cloud import texttospeech
-        import pychromecast, requests
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_TTS_KEY
+        if not _TTS_AVAILABLE:
+            raise RuntimeError("cliente do Google Cloud TTS não inicializado")
         os.environ.setdefault("NO_PROXY", f"127.0.0.1,localhost,{LOCAL_IP}")
         os.environ.setdefault("no_proxy", f"127.0.0.1,localhost,{LOCAL_IP}")
 
-        client = texttospeech.TextToSpeechClient()
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="pt-BR",
-            name="pt-BR-Standard-B",
-            ssml_gender=texttospeech.SsmlVoiceGender.MALE
-        )
-        audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
-
-        filename = f"speech_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-        filepath = os.path.join(TTS_DIR, filename)
-        with open(filepath, "wb") as out:
-            out.write(response.audio_content)
-            out.flush()
-            os.fsync(out.fileno())
-
-        logger.info(f"[TTS] Gravado: {filepath} ({os.path.getsize(filepath)} bytes)")
+        # Cache em disco: frase já sintetizada (ou pré-sintetizada) não volta para a API
+        filename, hit = _synthesize_cached(text)
+        if hit:
+            logger.info(f"[TTS] Cache hit: {filename}")
 
         url_public = f"http://{LOCAL_IP}:{LOCAL_PORT}/tts/{filename}"
-        url_self   = f"http://127.0.0.1:{LOCAL_PORT}/tts/{filename}"
 
-        try:
-            r = requests.get(url_self, timeout=3, proxies={"http": None, "https": None})
-            logger.info(f"[HTTP] Self-check ({r.status_code}): {url_self}")
-        except Exception as e:
-            logger.warning(f"[HTTP] Self-check falhou: {e}")
-
-        if not _tcp_open(NEST_IP, NEST_PORT):
+        if not _nest_reachable():
             logger.warning("Nest Hub inacessível.")
-            _speak_fallback(text)
+            _speak_fallback(text, nest_down=True)
             return
 
         try:
-            host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
-            cast = pychromecast.get_chromecast_from_host(host_info)
-            cast.wait()
+            cast = get_cast()
+            _playback.reset(url_public)
             cast.media_controller.play_media(url_public, "audio/mp3")
             cast.media_controller.block_until_active(timeout=5)
             cast.media_controller.play()
             logger.info(f"🔈 Falando (Google TTS): {text}")
-            time.sleep(5)
+            _playback.done.wait(timeout=PLAYBACK_TIMEOUT)
         except Exception as e:
             logger.warning(f"[Cast] Falhou tocar MP3 local ({e}). Usando fallback…")
+            _drop_cast()
             _speak_fallback(text)
     except Exception as e:
         logger.error(f"Erro no Google TTS: {e}")
         _speak_fallback(text)
 
-def _speak_fallback(text: str):
+def _speak_fallback(text: str, nest_down: bool = False):
+    """Fala via Translate TTS; `nest_down` = speak() acabou de ver o Nest fora (não refaz o probe)."""
     try:
-        import pychromecast
         from urllib.parse import quote_plus
-        if not _tcp_open(NEST_IP, NEST_PORT):
+        if nest_down or not _nest_reachable():
             logger.warning("Nest Hub inacessível (fallback).")
             return
-        host_info = (NEST_IP, NEST_PORT, None, "Google Nest Hub", "Google Nest Hub")
-        cast = pychromecast.get_chromecast_from_host(host_info)
-        cast.wait()
+        cast = get_cast()
         tts_url = f"https://translate.google.com/translate_tts?ie=UTF-8&q={quote_plus(text)}&tl=pt-BR&client=tw-ob"
+        _playback.reset(tts_url)
         cast.media_controller.play_media(tts_url, "audio/mp3")
         cast.media_controller.block_until_active()
         cast.media_controller.play()
         logger.info(f"🔈 Falando (fallback): {text}")
-        time.sleep(4)
+        _playback.done.wait(timeout=PLAYBACK_TIMEOUT)
     except Exception as e:
         logger.error(f"Erro no fallback speak(): {e}")
+        _drop_cast()
 
 # ---- Helpers de frase ------------------------------------------------------
 def _humanize_timedelta(seconds: float) -> str:
@@ -308,94 +591,128 @@ def _humanize_timedelta(seconds: float) -> str:
     return f"{horas} horas e {resto} {'minuto' if resto == 1 else 'minutos'}"
 
 
-def _build_alert_message(summary: str, start_dt: datetime) -> str:
+def _build_alert_message(summary: str, start_dt: datetime, now_dt: datetime = None) -> str:
     """
     Monta a frase final usando a ALERT_PHRASE do .env.
     Placeholders disponíveis: {summary} {hora} {lead} {agora}
     """
-    agora_dt = tz_now()
+    agora_dt = now_dt or tz_now()
     delta_secs = (start_dt - agora_dt).total_seconds()
     lead_str = _humanize_timedelta(delta_secs)
 
-    frase_base = os.getenv(
-        "ALERT_PHRASE",
-        'Gustavo, você tem uma reunião "{summary}" às {hora}, em {lead}.'
-    )
-
-    return frase_base.format(
+    return ALERT_PHRASE.format(
         summary=summary,
-        hora=start_dt.strftime("%H:%M"),
+        hora=start_dt.astimezone(_TZ).strftime("%H:%M"),
         lead=lead_str,
         agora=agora_dt.strftime("%H:%M"),
     )
 
 
+# ---- Pré-síntese -----------------------------------------------------------
+def _prewarm(events, now, seen):
+    """
+    Sintetiza com antecedência, no cache de TTS, a frase que a próxima execução
+    (daqui a RUN_INTERVAL_SECONDS) vai falar para os próximos PREWARM_EVENTS eventos
+    que só entram na janela de aviso nela — uma frase por evento, não uma por lead.
+    """
+    window_end = now + timedelta(minutes=LEAD_MINUTES)
+    next_run = now + timedelta(seconds=RUN_INTERVAL_SECONDS)
+    pending = 0
+    for e in events:
+        if pending >= PREWARM_EVENTS:
+            break
+        summary = e.get("summary", "(sem título)")
+        start_str = e.get("start", {}).get("dateTime")
+        if e.get("status") == "cancelled" or not start_str:
+            continue
+        if any(k in summary.lower() for k in EXCLUDE_KEYWORDS):
+            continue
+        if not REPEAT_ALERTS and summary in seen:
+            continue
+        try:
+            start = _parse(start_str)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=_TZ)
+            delta_min = (start - next_run).total_seconds() / 60
+            # já alertado nesta execução, ou ainda fora da janela da próxima
+            if start <= window_end or not (0 <= delta_min <= LEAD_MINUTES):
+                continue
+
+            pending += 1
+            _synthesize_cached(_build_alert_message(summary, start, next_run))
+        except Exception as err:
+            logger.warning(f"[TTS] Pré-síntese falhou para '{summary}': {err}")
+            return
+
 # ---- Execução principal ---------------------------------------------------
 def run_once():
     start_flask_server()
+    _prune_tts_cache()
     log_start_end("MeetingAlerts Run", start=True)
+    prewarm = None
     try:
         hours_ahead = 12 if DEBUG_MODE else 2
         logger.info(f"Config: LEAD={LEAD_MINUTES}min TZ={TZ_NAME} RANGE={hours_ahead}h DEBUG={DEBUG_MODE}")
 
-        service = get_calendar_service()
+        creds = get_calendar_credentials()
         # 🧹 Gerencia cache diário de alertas
         seen = load_seen()
-        today_str = tz_now().date().isoformat()
-        if not seen or all(v.get("date") != today_str for v in seen.values()):
-            # se não há cache de hoje → limpa e recria
-            if os.path.exists(CACHE_FILE):
-                os.remove(CACHE_FILE)
+        now = tz_now()
+        today_str = now.date().isoformat()
+        if not seen:
+            # se não há cache de hoje → descarta os dias anteriores
+            if purge_seen(today_str):
                 logger.info("🧹 Cache antigo removido (novo dia detectado).")
-            seen = {}
 
 
         # Busca eventos futuros
-        events = service.events().list(
-            calendarId=CALENDAR_ID,
-            timeMin=tz_now().isoformat(),
-            timeMax=(tz_now() + timedelta(hours=hours_ahead)).isoformat(),
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute().get("items", [])
+        events = fetch_events(creds, now, now + timedelta(hours=hours_ahead))
         logger.info(f"Eventos obtidos: {len(events)}")
 
+        # próximas reuniões: sintetiza em paralelo, fora do caminho crítico do alerta
+        if PREWARM_EVENTS and RUN_INTERVAL_SECONDS > 0 and _TTS_AVAILABLE and not DEBUG_MODE:
+            prewarm = threading.Thread(target=_prewarm, args=(events, now, seen), daemon=True)
+            prewarm.start()
+
         eventos_futuros = []
         evento_alertado = False
 
         for e in events:
+            # filtros baratos primeiro; parse da data só para quem sobrou
             if e.get("status") == "cancelled":
                 continue
 
+            summary = e.get("summary", "(sem título)")
+            summary_lower = summary.lower()
+            if any(k in summary_lower for k in EXCLUDE_KEYWORDS):
+                logger.info(f"[Ignorado por palavra-chave] '{summary}'")
+                continue
+            if not DEBUG_MODE and not REPEAT_ALERTS and summary in seen:
+                continue
+
             start_str = e["start"].get("dateTime")
             if not start_str:
                 continue
 
-            start = datetime.fromisoformat(start_str).astimezone(tz.gettz(TZ_NAME))
-            summary = e.get("summary", "(sem título)")
-            delta_min = (start - tz_now()).total_seconds() / 60
+            # o Google devolve RFC 3339 com offset: a subtração já respeita o fuso
+            start = _parse(start_str)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=_TZ)
+            delta_min = (start - now).total_seconds() / 60
 
             # Guarda para log posterior
-            eventos_futuros.append((summary, start.strftime("%H:%M"), round(delta_min)))
-
-            # 🧪 DEBUG → fala o primeiro evento futuro com a mesma frase do modo normal
-            if DEBUG_MODE:
-                msg = _build_alert_message(summary, start)
-                logger.info(f"[DEBUG] {msg}")
-                speak(msg)
-                evento_alertado = True
-                break
+            eventos_futuros.append((summary, start.astimezone(_TZ).strftime("%H:%M"), round(delta_min)))
 
-            # 🔔 Normal → alerta se dentro da janela (<= LEAD_MINUTES)
-            if 0 <= delta_min <= LEAD_MINUTES:
-                if not REPEAT_ALERTS and summary in seen:
-                    continue
-                msg = _build_alert_message(summary, start)
-                speak(msg)
+            # 🧪 DEBUG → fala o primeiro evento futuro; 🔔 normal → só dentro da janela (<= LEAD_MINUTES)
+            if not (DEBUG_MODE or 0 <= delta_min <= LEAD_MINUTES):
+                continue
+            msg = _build_alert_message(summary, start, now)
+            logger.info(f"[{'DEBUG' if DEBUG_MODE else 'Aviso emitido'}] {msg}")
+            speak(msg)
+            if not DEBUG_MODE:
                 mark_alerted(seen, summary)
-                logger.info(f"[Aviso emitido] {msg}")
-                evento_alertado = True
-                break
+            evento_alertado = True
+            break
 
         # 🪶 Pós-laço → logs explicativos
         if not events:
@@ -409,6 +726,8 @@ def run_once():
         logger.error(f"Erro geral: {e}")
         logger.debug(traceback.format_exc())
     finally:
+        if prewarm is not None:
+            prewarm.join(timeout=60)  # o processo é de uma passada: deixa a pré-síntese terminar
         log_start_end("MeetingAlerts Run", start=False)
 
 if __name__ == "__main__":
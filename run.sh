@@ -0,0 +1,5 @@
+#!/bin/bash
+# Ativa o venv local e executa o script (argumentos repassados)
+cd "$(dirname "$0")"
+source .venv/bin/activate
+exec python meeting_alerts.py "$@"
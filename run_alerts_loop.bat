@@ -2,8 +2,15 @@
 cd /d "%~dp0"
 call .venv\Scripts\activate
 
+REM pausa entre execuções: RUN_INTERVAL_SECONDS do ambiente ou do .env (padrão 300);
+REM fica exportada para o Python, que mira a pré-síntese na próxima execução
+if not defined RUN_INTERVAL_SECONDS if exist .env (
+    for /f "usebackq tokens=1,* delims== " %%a in (".env") do if /i "%%a"=="RUN_INTERVAL_SECONDS" set "RUN_INTERVAL_SECONDS=%%b"
+)
+if not defined RUN_INTERVAL_SECONDS set "RUN_INTERVAL_SECONDS=300"
+
 echo [INFO] Iniciando monitoramento de reuniões (loop contínuo)...
 :loop
 python meeting_alerts.py
-timeout /t 300 >nul  & REM aguarda 5 minutos (300 segundos)
+timeout /t %RUN_INTERVAL_SECONDS% >nul  & REM aguarda RUN_INTERVAL_SECONDS (padrão: 5 minutos)
 goto loop
\ No newline at end of file
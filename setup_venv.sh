@@ -9,5 +9,4 @@ pip install -r requirements.txt
 
 echo "[INFO] Ambiente pronto!"
 echo "Para executar:"
-echo "   source .venv/bin/activate"
-echo "   python meeting_alerts.py"
+echo "   ./run.sh"